@@ -3,27 +3,39 @@ FastAPI application with WebSocket for real-time voice communication
 """
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 import os
-import base64
+import sys
+import struct
 import asyncio
-from backend import VoiceAssistantBackend
+import orjson
+from pathlib import Path
+from backend import VoiceAssistantBackend, warm_up_connections
+from prompts import THINKING_MESSAGE
+from config import THINKING_FILLER_DELAY
 import uvicorn
 
-app = FastAPI(title="Voice Assistant API")
+app = FastAPI(title="Voice Assistant API", default_response_class=ORJSONResponse)
 
-# Store active sessions
-sessions = {}
+# 1-byte type tags prefixed to binary WebSocket frames
+FRAME_PCM = 0x01          # client -> server: 16 kHz Int16 microphone PCM
+FRAME_AUDIO_CHUNK = 0x02  # server -> client: uint32 seq + streamed response MP3 chunk
+FRAME_AUDIO_CLIP = 0x03   # server -> client: complete MP3 for the preceding assistant_response
 
-# Load HTML content
-with open("templates/index.html", "r") as f:
-    html_content = f.read()
+# Load HTML content once, already encoded
+html_bytes = Path("templates/index.html").read_bytes()
 
 
 @app.get("/", response_class=HTMLResponse)
 async def get_index():
     """Serve the main page"""
-    return html_content
+    return HTMLResponse(content=html_bytes)
+
+
+@app.on_event("startup")
+async def warm_up():
+    """Pre-open API connections so the first session doesn't pay the TLS handshakes"""
+    await warm_up_connections()
 
 
 @app.get("/health")
@@ -32,92 +44,213 @@ async def health_check():
     return {"status": "healthy"}
 
 
+async def send_message(websocket: WebSocket, message: dict):
+    """Send a JSON control message, encoded with orjson"""
+    await websocket.send_text(orjson.dumps(message).decode())
+
+
+async def stream_reply(websocket: WebSocket, backend: VoiceAssistantBackend, sentences) -> str:
+    """
+    Speak LLM sentences as they arrive, forwarding TTS audio to the client as
+    soon as ElevenLabs streams it back. If no audio has arrived after
+    THINKING_FILLER_DELAY, a short filler is played meanwhile.
+    Returns the full response text.
+    """
+    spoken = []
+    seq = 0
+    filler_playing = False
+    
+    async def send_chunk(chunk: bytes):
+        nonlocal seq
+        await websocket.send_bytes(struct.pack("!BI", FRAME_AUDIO_CHUNK, seq) + chunk)
+        seq += 1
+    
+    async def play_filler():
+        # Mask a slow LLM start with a (TTS-cached) filler so there's no dead air
+        nonlocal filler_playing
+        await asyncio.sleep(THINKING_FILLER_DELAY)
+        filler_playing = True
+        filler_audio = await backend.synthesize_speech(THINKING_MESSAGE)
+        if filler_audio:
+            await send_chunk(filler_audio)
+    
+    async def record(sentences):
+        async for sentence in sentences:
+            spoken.append(sentence)
+            yield sentence
+    
+    filler = asyncio.create_task(play_filler())
+    try:
+        async for chunk in backend.stream_speech(record(sentences)):
+            # Real audio is here: skip the filler unless it is already playing
+            if not filler.done():
+                if filler_playing:
+                    await filler
+                else:
+                    filler.cancel()
+            await send_chunk(chunk)
+    finally:
+        filler.cancel()
+    
+    return " ".join(spoken)
+
+
+async def reply_to_transcripts(websocket: WebSocket, backend: VoiceAssistantBackend, transcripts: asyncio.Queue):
+    """Answer each user utterance, one at a time: a final transcript, or WAV still to transcribe"""
+    while True:
+        user_text = await transcripts.get()
+        if isinstance(user_text, bytes):
+            user_text = await backend.transcribe_audio(user_text)
+            if not user_text:
+                continue
+        print(f"User said: {user_text}")
+        
+        try:
+            await send_message(websocket, {
+                "type": "user_transcript",
+                "text": user_text
+            })
+            
+            # Streamed LLM -> sentence-chunked streaming TTS
+            text_response = await stream_reply(websocket, backend, backend.stream_response(user_text))
+            
+            # Mark the end of the streamed assistant response
+            await send_message(websocket, {
+                "type": "assistant_response_end",
+                "text": text_response
+            })
+        
+        except Exception as e:
+            print(f"Error responding: {e}")
+            await send_message(websocket, {
+                "type": "error",
+                "message": str(e)
+            })
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time communication"""
-    await websocket.accept()
-    
-    # Create session
+    # Create session (lives exactly as long as this handler)
     session_id = id(websocket)
     backend = VoiceAssistantBackend()
-    sessions[session_id] = backend
-    print(f"Client connected: {session_id}")
     
-    # Send connection confirmation
-    await websocket.send_json({
-        "type": "connected",
-        "session_id": str(session_id)
-    })
-
-    # --- SEND GREETING IMMEDIATELY ---
+    # Start the greeting TTS while the handshake completes
+    welcome = asyncio.create_task(backend.get_welcome_audio())
+    
+    # Final transcripts (or, when real-time STT fails, the utterance's WAV)
+    # arrive on the real-time STT thread; answer them in order
+    loop = asyncio.get_running_loop()
+    transcripts = asyncio.Queue()
+    responder = asyncio.create_task(reply_to_transcripts(websocket, backend, transcripts))
+    
+    # The real-time STT session is billed while open and dropped by AssemblyAI when idle,
+    # so it is opened on start_conversation and reopened by the next utterance if it closed
+    opening = None
+    
+    async def open_transcription():
+        try:
+            await asyncio.to_thread(
+                backend.start_realtime_transcription,
+                lambda text: loop.call_soon_threadsafe(transcripts.put_nowait, text),
+                lambda wav: loop.call_soon_threadsafe(transcripts.put_nowait, wav)
+            )
+        except Exception as e:
+            print(f"Error starting realtime transcription: {e}")
+    
+    def start_transcription():
+        nonlocal opening
+        if opening is None or opening.done():
+            opening = asyncio.create_task(open_transcription())
+    
+    async def stop_transcription():
+        if opening is not None:
+            await opening
+        await asyncio.to_thread(backend.close_realtime_transcription)
+    
     try:
-        welcome_audio = backend.get_welcome_audio()
-        audio_base64 = base64.b64encode(welcome_audio).decode('utf-8')
+        await websocket.accept()
+        print(f"Client connected: {session_id}")
         
-        await websocket.send_json({
-            "type": "assistant_response",
-            "text": "Hello! How may I help you today?",
-            "audio": audio_base64,
-            "is_welcome": True
+        # Send connection confirmation
+        await send_message(websocket, {
+            "type": "connected",
+            "session_id": str(session_id)
         })
-    except Exception as e:
-        print(f"Error sending welcome message: {e}")
-
-    try:
+        
+        # --- SEND GREETING IMMEDIATELY ---
+        try:
+            welcome_audio = await welcome
+            
+            await send_message(websocket, {
+                "type": "assistant_response",
+                "text": "Hello! How may I help you today?",
+                "is_welcome": True
+            })
+            await websocket.send_bytes(bytes([FRAME_AUDIO_CLIP]) + welcome_audio)
+        except Exception as e:
+            print(f"Error sending welcome message: {e}")
+        
         while True:
             # Receive message from client
-            data = await websocket.receive_json()
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            
+            frame = message.get("bytes")
+            if frame is not None:
+                if frame[:1] == bytes([FRAME_PCM]) and backend.stream_audio(frame[1:]):
+                    start_transcription()
+                continue
+            
+            data = orjson.loads(message["text"])
             message_type = data.get("type")
             
-            if message_type == "user_audio":
+            if message_type == "start_conversation":
+                start_transcription()
+            
+            elif message_type == "end_of_speech":
                 try:
-                    # Decode audio from base64
-                    audio_data = base64.b64decode(data['audio'])
-                    
-                    # Process through pipeline: STT -> LLM -> TTS
-                    text_response, audio_response = backend.process_user_audio(audio_data)
-                    
-                    if text_response and audio_response:
-                        # Send assistant response
-                        audio_base64 = base64.b64encode(audio_response).decode('utf-8')
-                        await websocket.send_json({
-                            "type": "assistant_response",
-                            "text": text_response,
-                            "audio": audio_base64
-                        })
-                    else:
-                        await websocket.send_json({
-                            "type": "error",
-                            "message": "Failed to process audio"
-                        })
+                    # Only returns audio when real-time STT is unavailable
+                    wav_audio = backend.end_utterance()
+                    if wav_audio:
+                        transcripts.put_nowait(wav_audio)
                 
                 except Exception as e:
                     print(f"Error processing audio: {e}")
-                    await websocket.send_json({
+                    await send_message(websocket, {
                         "type": "error",
                         "message": str(e)
                     })
             
             elif message_type == "end_conversation":
+                await stop_transcription()
+                
                 # Save conversation
                 filename = backend.save_conversation()
-                await websocket.send_json({
+                await send_message(websocket, {
                     "type": "conversation_saved",
                     "filename": filename
                 })
                 print(f"Conversation ended and saved: {filename}")
     
     except WebSocketDisconnect:
-        # Clean up on disconnect
-        if session_id in sessions:
-            filename = sessions[session_id].save_conversation()
-            print(f"Client disconnected: {session_id}, conversation saved to {filename}")
-            del sessions[session_id]
+        print(f"Client disconnected: {session_id}")
     
     except Exception as e:
         print(f"WebSocket error: {e}")
-        if session_id in sessions:
-            del sessions[session_id]
+    
+    finally:
+        # Clean up however the handler exits
+        responder.cancel()
+        if not welcome.done():
+            welcome.cancel()
+        elif not welcome.cancelled() and welcome.exception():
+            print(f"Error synthesizing welcome message: {welcome.exception()}")
+        await stop_transcription()
+        filename = backend.save_conversation()
+        backend.close()
+        print(f"Session {session_id} closed, conversation saved to {filename}")
 
 
 if __name__ == '__main__':
@@ -126,5 +259,11 @@ if __name__ == '__main__':
         app, 
         host='127.0.0.1',  # Use 127.0.0.1 for mic access in browsers
         port=8000,
+        # libuv event loop + C HTTP parser from uvicorn[standard]; uvloop has no Windows build
+        loop='asyncio' if sys.platform == 'win32' else 'uvloop',
+        http='httptools',
+        ws='websockets',
+        # Audio frames are already-compressed MP3/PCM; deflate only burns CPU
+        ws_per_message_deflate=False,
         log_level='info'
     )
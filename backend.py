@@ -3,20 +3,148 @@ Backend service handling STT, LLM, and TTS integration
 """
 
 import os
+import io
+import hashlib
+import re
+import wave
 import asyncio
-import json
+import threading
+import secrets
+import base64
+import orjson
+import websockets
+from collections import deque, OrderedDict
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Deque, AsyncIterator, Callable
 from dotenv import load_dotenv
+import httpx
 import assemblyai as aai
-from openai import OpenAI
-from elevenlabs import ElevenLabs
+from openai import AsyncOpenAI
+from elevenlabs import AsyncElevenLabs
 import requests
-from prompts import SYSTEM_PROMPT, WELCOME_MESSAGE, MAX_CONVERSATION_HISTORY
+from prompts import (
+    SYSTEM_PROMPT, WELCOME_MESSAGE, FALLBACK_RESPONSE, ACKNOWLEDGEMENT_MESSAGE,
+    BACKCHANNEL_PHRASES, MAX_CONVERSATION_HISTORY
+)
+from config import (
+    AUDIO_SAMPLE_RATE, MIN_VOICED_BYTES, REALTIME_END_UTTERANCE_SILENCE_MS,
+    ELEVENLABS_VOICE_ID, ELEVENLABS_MODEL, ELEVENLABS_OPTIMIZE_LATENCY
+)
 
 # Load environment variables
 load_dotenv()
 
+# Connection pool shared by every session, so TLS handshakes are paid once per process
+# (idle connections are kept for a minute instead of httpx's default 5 s)
+http_client = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60)
+)
+
+# Cheap endpoints used to open pooled connections before the first turn
+WARM_UP_URLS = [
+    "https://api.openai.com/v1/models",
+    "https://api.elevenlabs.io/v1/voices",
+]
+
+# Input-streaming TTS: text goes in sentence by sentence, MP3 comes back as it's generated
+ELEVENLABS_STREAM_URL = (
+    f"wss://api.elevenlabs.io/v1/text-to-speech/{ELEVENLABS_VOICE_ID}/stream-input"
+    f"?model_id={ELEVENLABS_MODEL}&optimize_streaming_latency={ELEVENLABS_OPTIMIZE_LATENCY}"
+    "&sync_alignment=true"
+)
+
+# Fixed replies that are synthesized once and then served from the TTS cache
+CANNED_RESPONSES = {FALLBACK_RESPONSE, ACKNOWLEDGEMENT_MESSAGE}
+
+# The greeting is identical for every session: synthesize it once and keep it on disk
+# (the file name tracks the text, voice and model, so changing any of them re-synthesizes it)
+_welcome_key = f"{ELEVENLABS_VOICE_ID}:{ELEVENLABS_MODEL}:{WELCOME_MESSAGE}"
+WELCOME_AUDIO_FILE = f"welcome_{hashlib.sha1(_welcome_key.encode()).hexdigest()[:8]}.mp3"
+_welcome_audio = b""
+_welcome_lock = asyncio.Lock()
+
+# Recently synthesized speech by text, shared by all sessions. Streamed replies
+# bypass it, so it only holds canned clips and REST fallback sentences
+TTS_CACHE_SIZE = 32
+_tts_cache: "OrderedDict[str, bytes]" = OrderedDict()
+
+
+def get_cached_speech(text: str) -> bytes:
+    """
+    Look up cached audio for text, b"" on a miss
+    """
+    audio = _tts_cache.get(text, b"")
+    if audio:
+        _tts_cache.move_to_end(text)
+    return audio
+
+
+def cache_speech(text: str, audio: bytes):
+    """
+    Remember audio for text, evicting the least recently used entry when full
+    """
+    _tts_cache[text] = audio
+    _tts_cache.move_to_end(text)
+    if len(_tts_cache) > TTS_CACHE_SIZE:
+        _tts_cache.popitem(last=False)
+
+
+# Flush buffered LLM tokens to TTS after this many even without a sentence end
+MAX_TOKENS_PER_CHUNK = 80
+
+
+def is_sentence_boundary(buf: str, tok: str) -> bool:
+    """
+    True when buf ends a sentence and the next token starts a new one
+    (waiting for the whitespace keeps decimals like "3.5" in one chunk)
+    """
+    return bool(re.search(r'[.?!]\s*$', buf)) and tok[:1].isspace()
+
+
+async def warm_up_connections():
+    """
+    Open connections to the OpenAI, ElevenLabs and AssemblyAI APIs so the first
+    turn reuses them instead of paying DNS + TLS (responses are ignored)
+    """
+    async def warm(request):
+        try:
+            await request
+        except Exception as e:
+            print(f"Connection warm-up failed: {e}")
+    
+    warm_ups = [http_client.head(url, timeout=5) for url in WARM_UP_URLS]
+    
+    # The AssemblyAI SDK keeps its own (blocking) connection pool
+    assemblyai_key = os.getenv("ASSEMBLYAI_API_KEY")
+    if assemblyai_key:
+        aai.settings.api_key = assemblyai_key
+        warm_ups.append(asyncio.to_thread(
+            lambda: aai.Client.get_default().http_client.head("/", timeout=5)
+        ))
+    
+    await asyncio.gather(*(warm(request) for request in warm_ups))
+
+
+def is_backchannel(text: str) -> bool:
+    """
+    True for filler utterances like "Okay." or "Hmm" that don't need the LLM
+    """
+    return re.sub(r"[^\w\s]", "", text).strip().lower() in BACKCHANNEL_PHRASES
+
+
+def pcm_to_wav(pcm: bytes) -> bytes:
+    """
+    Wrap 16-bit mono PCM from the client in a WAV container
+    """
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(AUDIO_SAMPLE_RATE)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
 
 class VoiceAssistantBackend:
     def __init__(self):
@@ -33,38 +161,66 @@ class VoiceAssistantBackend:
         if not self.elevenlabs_key:
             raise ValueError("ELEVENLABS_API_KEY not found in environment variables")
         
-        # Setup clients
+        # Setup clients (the AssemblyAI SDK pools its own connections)
         aai.settings.api_key = self.assemblyai_key
-        self.openai_client = OpenAI(api_key=self.openai_key)
-        self.elevenlabs_client = ElevenLabs(api_key=self.elevenlabs_key)
+        self.transcriber = aai.Transcriber()
+        self.realtime_transcriber = None
+        self._realtime_ready = False
+        
+        # PCM of the current utterance, kept even while streaming so a failed
+        # real-time session can fall back to batch transcription
+        self._pcm_chunks: List[bytes] = []
+        self._ended_pcm = b""
+        
+        # Finals of the current utterance, joined into one transcript on end_of_speech
+        self._final_parts: List[str] = []
+        self._utterance_ended = False
+        self._stt_lock = threading.Lock()  # shared with the SDK's callback thread
+        self.openai_client = AsyncOpenAI(api_key=self.openai_key, http_client=http_client)
+        self.elevenlabs_client = AsyncElevenLabs(api_key=self.elevenlabs_key, httpx_client=http_client)
+        
+        # Conversation storage (system prompt kept apart, it is never saved)
+        self._system = {"role": "system", "content": SYSTEM_PROMPT}
+        self._messages: List[Dict] = []
+        # Random suffix: sessions started in the same second get their own files
+        self.session_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{secrets.token_hex(3)}"
+        self._saved_count = 0
+        
+        # Crash-safe journal: each message is appended as a JSON line as it happens,
+        # so a hard disconnect or crash loses nothing
+        self._journal_path = f"conversation_{self.session_id}.jsonl"
+        self._journal = open(self._journal_path, "x", buffering=1, encoding="utf-8")
         
-        # Conversation storage
-        self.conversation_history: List[Dict] = []
-        self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Recent messages sent to the LLM (without timestamps), oldest dropped first
+        self._api_window: Deque[Dict] = deque(maxlen=MAX_CONVERSATION_HISTORY)
+    
+    def _record(self, role: str, content: str, **extra):
+        """
+        Append a message to the LLM window and, timestamped, to the saved log
+        """
+        entry = {"role": role, "content": content}
+        self._api_window.append(entry)
         
-        # Initialize with system prompt
-        self.conversation_history.append({
-            "role": "system",
-            "content": SYSTEM_PROMPT
-        })
+        message = {
+            **entry,
+            "timestamp": datetime.now().isoformat(),
+            **extra
+        }
+        self._messages.append(message)
+        if not self._journal.closed:
+            self._journal.write(orjson.dumps(message).decode() + "\n")
     
-    def transcribe_audio(self, audio_data: bytes) -> str:
+    async def transcribe_audio(self, audio_data: bytes) -> str:
         """
         Transcribe audio using AssemblyAI
         """
+        # Too short to hold speech (VAD false positive, accidental tap)
+        if len(audio_data) < MIN_VOICED_BYTES:
+            return ""
+        
         try:
-            # Save audio temporarily
-            temp_file = f"temp_audio_{self.session_id}.wav"
-            with open(temp_file, "wb") as f:
-                f.write(audio_data)
-            
-            # Transcribe
-            transcriber = aai.Transcriber()
-            transcript = transcriber.transcribe(temp_file)
-            
-            # Clean up
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
+            # Upload straight from memory, no temp file; the SDK blocks, so keep it off the event loop
+            transcript = await asyncio.to_thread(self.transcriber.transcribe, io.BytesIO(audio_data))
             
             return transcript.text if transcript.text else ""
         
@@ -72,68 +228,203 @@ class VoiceAssistantBackend:
             print(f"Transcription error: {e}")
             return ""
     
-    def get_llm_response(self, user_message: str) -> str:
+    def start_realtime_transcription(self, on_transcript: Callable[[str], None], on_audio: Callable[[bytes], None]):
         """
-        Get response from OpenAI
+        Open an AssemblyAI real-time session for the microphone stream, unless
+        one is already open; a failed earlier session is replaced, and frames
+        of an utterance already in progress are streamed to it first.
+        on_transcript is called from the SDK's thread once per utterance, with
+        every final transcript received up to the end of speech joined together.
+        If the session fails before an ended utterance's final arrives,
+        on_audio is called with that utterance as WAV for batch transcription.
         """
-        try:
-            # Add user message to history
-            self.conversation_history.append({
-                "role": "user",
-                "content": user_message,
-                "timestamp": datetime.now().isoformat()
-            })
+        def on_data(transcript: aai.RealtimeTranscript):
+            if not isinstance(transcript, aai.RealtimeFinalTranscript):
+                return
             
-            # Prepare messages for API (without timestamps for API call)
-            api_messages = [
-                {"role": msg["role"], "content": msg["content"]}
-                for msg in self.conversation_history
-                if msg["role"] in ["system", "user", "assistant"]
-            ]
+            with self._stt_lock:
+                if transcript.text:
+                    self._final_parts.append(transcript.text)
+                # Finals on mid-speech pauses wait for the end of the utterance
+                if not self._utterance_ended:
+                    return
+                text = " ".join(self._final_parts)
+                self._final_parts = []
+                self._utterance_ended = False
+                self._ended_pcm = b""
             
-            # Keep only recent history to avoid token limits
-            if len(api_messages) > MAX_CONVERSATION_HISTORY + 1:  # +1 for system
-                api_messages = [api_messages[0]] + api_messages[-(MAX_CONVERSATION_HISTORY):]
+            if text:
+                on_transcript(text)
+        
+        def on_error(error: aai.RealtimeError):
+            # An utterance in progress is batch transcribed from its buffered PCM on
+            # end_of_speech; one already ended is handed over now
+            print(f"Realtime transcription error: {error}")
+            with self._stt_lock:
+                self._realtime_ready = False
+                self._final_parts = []
+                self._utterance_ended = False
+                pcm, self._ended_pcm = self._ended_pcm, b""
             
+            if pcm:
+                on_audio(pcm_to_wav(pcm))
+        
+        if self._realtime_ready:
+            return
+        self.close_realtime_transcription()
+        
+        self.realtime_transcriber = aai.RealtimeTranscriber(
+            sample_rate=AUDIO_SAMPLE_RATE,
+            on_data=on_data,
+            on_error=on_error,
+            # The mic button marks the end of speech, so pauses shouldn't end utterances
+            end_utterance_silence_threshold=REALTIME_END_UTTERANCE_SILENCE_MS
+        )
+        self.realtime_transcriber.connect()
+        
+        with self._stt_lock:
+            for chunk in self._pcm_chunks:
+                self.realtime_transcriber.stream(chunk)
+            self._realtime_ready = True
+    
+    def stream_audio(self, pcm: bytes) -> bool:
+        """
+        Feed a frame of 16 kHz Int16 PCM from the client.
+        Returns True if it starts an utterance while no real-time session is
+        open (never opened, closed, or dropped after an error or idle timeout).
+        """
+        with self._stt_lock:
+            starts_utterance = not self._pcm_chunks
+            self._pcm_chunks.append(pcm)
+            if self._realtime_ready:
+                self.realtime_transcriber.stream(pcm)
+            return starts_utterance and not self._realtime_ready
+    
+    def end_utterance(self) -> bytes:
+        """
+        Mark the end of the user's speech.
+        Returns the utterance as WAV if it still needs batch transcription,
+        or b"" when the real-time session will deliver the final transcript.
+        """
+        with self._stt_lock:
+            pcm = b"".join(self._pcm_chunks)
+            self._pcm_chunks = []
+            realtime = self._realtime_ready
+            if realtime:
+                self._utterance_ended = True
+                self._ended_pcm = pcm
+        
+        if realtime:
+            try:
+                # The final transcript this forces releases the buffered ones (see on_data)
+                self.realtime_transcriber.force_end_utterance()
+                return b""
+            except Exception as e:
+                print(f"Realtime transcription error: {e}")
+                # Unless on_error already handed the utterance over
+                with self._stt_lock:
+                    self._realtime_ready = False
+                    self._utterance_ended = False
+                    pcm, self._ended_pcm = self._ended_pcm, b""
+        
+        return pcm_to_wav(pcm) if pcm else b""
+    
+    def close_realtime_transcription(self):
+        """
+        Close the real-time session, if one was opened
+        """
+        with self._stt_lock:
+            transcriber, self.realtime_transcriber = self.realtime_transcriber, None
+            self._realtime_ready = False
+        
+        try:
+            if transcriber:
+                transcriber.close()
+        except Exception as e:
+            print(f"Error closing realtime transcription: {e}")
+    
+    async def get_llm_response(self, user_message: str) -> AsyncIterator[str]:
+        """
+        Stream response tokens from OpenAI
+        """
+        # Add user message to history
+        self._record("user", user_message)
+        
+        tokens: List[str] = []
+        try:
             # Call OpenAI
-            response = self.openai_client.chat.completions.create(
+            stream = await self.openai_client.chat.completions.create(
                 model="gpt-4o-mini",
-                messages=api_messages,
+                messages=[self._system, *self._api_window],
                 temperature=0.7,
-                max_tokens=300
+                max_tokens=300,
+                stream=True
             )
             
-            assistant_message = response.choices[0].message.content
-            
-            # Add assistant response to history
-            self.conversation_history.append({
-                "role": "assistant",
-                "content": assistant_message,
-                "timestamp": datetime.now().isoformat()
-            })
-            
-            return assistant_message
+            async for chunk in stream:
+                token = chunk.choices[0].delta.content if chunk.choices else None
+                if token:
+                    tokens.append(token)
+                    yield token
         
         except Exception as e:
             print(f"LLM error: {e}")
-            return "I apologize, but I'm having trouble processing that right now. Could you please try again?"
+            if not tokens:
+                yield FALLBACK_RESPONSE
+                return
+        
+        assistant_message = "".join(tokens)
+        print(f"Assistant: {assistant_message}")
+        
+        # Add assistant response to history
+        self._record("assistant", assistant_message)
+    
+    async def stream_response(self, user_message: str) -> AsyncIterator[str]:
+        """
+        Stream the LLM response as sentences ready for TTS
+        """
+        # Backchannels get a canned (TTS-cached) acknowledgement, no LLM call,
+        # unless they may be answering a question the assistant just asked
+        last_reply = self._api_window[-1]["content"] if self._api_window else ""
+        if is_backchannel(user_message) and not last_reply.rstrip().endswith("?"):
+            self._record("user", user_message)
+            self._record("assistant", ACKNOWLEDGEMENT_MESSAGE)
+            yield ACKNOWLEDGEMENT_MESSAGE
+            return
+        
+        buffer = ""
+        token_count = 0
+        async for token in self.get_llm_response(user_message):
+            if buffer.strip() and (token_count >= MAX_TOKENS_PER_CHUNK or is_sentence_boundary(buffer, token)):
+                yield buffer.strip()
+                buffer, token_count = "", 0
+            buffer += token
+            token_count += 1
+        
+        if buffer.strip():
+            yield buffer.strip()
     
-    def synthesize_speech(self, text: str) -> bytes:
+    async def synthesize_speech(self, text: str) -> bytes:
         """
         Convert text to speech using ElevenLabs
         """
+        cached = get_cached_speech(text)
+        if cached:
+            return cached
+        
         try:
             # Generate audio
             audio = self.elevenlabs_client.text_to_speech.convert(
-                voice_id="21m00Tcm4TlvDq8ikWAM",  # Rachel voice (default)
+                voice_id=ELEVENLABS_VOICE_ID,
                 text=text,
-                model_id="eleven_turbo_v2_5"
+                model_id=ELEVENLABS_MODEL,
+                optimize_streaming_latency=ELEVENLABS_OPTIMIZE_LATENCY
             )
             
-            # Collect audio chunks
-            audio_data = b""
-            for chunk in audio:
-                audio_data += chunk
+            # Collect audio chunks (joined once rather than re-copied on every +=)
+            audio_data = b"".join([chunk async for chunk in audio])
+            if audio_data:
+                cache_speech(text, audio_data)
             
             return audio_data
         
@@ -141,17 +432,150 @@ class VoiceAssistantBackend:
             print(f"TTS error: {e}")
             return b""
     
-    def get_welcome_audio(self) -> bytes:
+    async def stream_speech(self, sentences: AsyncIterator[str]) -> AsyncIterator[bytes]:
         """
-        Generate welcome message audio
+        Stream MP3 for a reply over one ElevenLabs input-streaming WebSocket:
+        each sentence is sent as soon as the LLM finishes it, and audio is
+        yielded as soon as ElevenLabs returns it. If the socket fails, the
+        rest of the reply is synthesized sentence by sentence over REST.
         """
-        self.conversation_history.append({
-            "role": "assistant",
-            "content": WELCOME_MESSAGE,
-            "timestamp": datetime.now().isoformat(),
-            "type": "welcome"
-        })
-        return self.synthesize_speech(WELCOME_MESSAGE)
+        # The LLM stream is read by its own task, so a TTS failure never cuts it short
+        text_queue = asyncio.Queue()
+        
+        async def read_sentences():
+            try:
+                async for sentence in sentences:
+                    text_queue.put_nowait(sentence)
+            finally:
+                text_queue.put_nowait(None)
+        
+        reader = asyncio.create_task(read_sentences())
+        connecting = sender = receiving = None
+        
+        handed: List[str] = []  # sentences taken off the queue for the socket
+        spoken_chars = 0        # non-space characters ElevenLabs has returned audio for
+        text_done = False
+        
+        async def next_sentence():
+            nonlocal text_done
+            sentence = await text_queue.get()
+            if sentence is None:
+                text_done = True
+            else:
+                handed.append(sentence)
+            return sentence
+        
+        try:
+            first = await next_sentence()
+            if first is None:
+                return
+            
+            # Canned replies are always a single sentence; they go straight to the cached REST path
+            # and never open a socket (nor do empty replies, which end before this)
+            if first not in CANNED_RESPONSES:
+                try:
+                    connecting = asyncio.ensure_future(websockets.connect(
+                        ELEVENLABS_STREAM_URL,
+                        extra_headers={"xi-api-key": self.elevenlabs_key},
+                        compression=None
+                    ))
+                    tts = await connecting
+                    
+                    async def send_text():
+                        # A single space opens the stream, an empty string closes it
+                        await tts.send(orjson.dumps({"text": " "}).decode())
+                        sentence = first
+                        while sentence is not None:
+                            await tts.send(orjson.dumps({"text": sentence + " ", "flush": True}).decode())
+                            sentence = await next_sentence()
+                        await tts.send(orjson.dumps({"text": ""}).decode())
+                    
+                    sender = asyncio.create_task(send_text())
+                    
+                    while True:
+                        if receiving is None:
+                            receiving = asyncio.ensure_future(tts.recv())
+                        
+                        # Watch the sender too: if it fails, the closing message never goes out
+                        waiting = {receiving} if sender.done() else {receiving, sender}
+                        await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                        if sender.done() and sender.exception():
+                            raise sender.exception()
+                        if not receiving.done():
+                            continue
+                        
+                        data = orjson.loads(receiving.result())
+                        receiving = None
+                        if data.get("audio"):
+                            # The alignment lists the characters this audio speaks
+                            alignment = data.get("alignment") or data.get("normalizedAlignment") or {}
+                            spoken_chars += sum(1 for char in alignment.get("chars", []) if not char.isspace())
+                            yield base64.b64decode(data["audio"])
+                        if data.get("isFinal"):
+                            return
+                
+                except Exception as e:
+                    print(f"TTS stream error, falling back to REST: {e}")
+                    for task in (sender, receiving):
+                        if task:
+                            task.cancel()
+            
+            # REST path: resume from the first sentence the socket's audio didn't fully cover,
+            # then the rest of the reply
+            resume = 0
+            for sentence in handed:
+                length = len("".join(sentence.split()))
+                if spoken_chars < length:
+                    break
+                spoken_chars -= length
+                resume += 1
+            
+            for sentence in handed[resume:]:
+                audio = await self.synthesize_speech(sentence)
+                if audio:
+                    yield audio
+            
+            while not text_done:
+                sentence = await next_sentence()
+                if sentence is not None:
+                    audio = await self.synthesize_speech(sentence)
+                    if audio:
+                        yield audio
+        
+        finally:
+            for task in (sender, receiving, reader):
+                if task and not task.done():
+                    task.cancel()
+            if connecting is not None:
+                if not connecting.done():
+                    connecting.cancel()
+                elif not connecting.cancelled() and connecting.exception() is None:
+                    await connecting.result().close()
+    
+    async def get_welcome_audio(self) -> bytes:
+        """
+        Get welcome message audio, synthesizing it only on first use
+        """
+        global _welcome_audio
+        
+        self._record("assistant", WELCOME_MESSAGE, type="welcome")
+        
+        # Concurrent cold-start sessions wait for a single synthesis
+        async with _welcome_lock:
+            if not _welcome_audio:
+                if os.path.exists(WELCOME_AUDIO_FILE):
+                    with open(WELCOME_AUDIO_FILE, "rb") as f:
+                        _welcome_audio = f.read()
+                else:
+                    _welcome_audio = await self.synthesize_speech(WELCOME_MESSAGE)
+                    if _welcome_audio:
+                        # Write then rename, so a crash can't leave a truncated file behind
+                        temp_file = f"{WELCOME_AUDIO_FILE}.{os.getpid()}.tmp"
+                        with open(temp_file, "wb") as f:
+                            f.write(_welcome_audio)
+                        os.replace(temp_file, WELCOME_AUDIO_FILE)
+        
+        return _welcome_audio
     
     def save_conversation(self) -> str:
         """
@@ -163,18 +587,16 @@ class VoiceAssistantBackend:
             # Prepare conversation data
             conversation_data = {
                 "session_id": self.session_id,
-                "start_time": self.conversation_history[1]["timestamp"] if len(self.conversation_history) > 1 else None,
+                "start_time": self._messages[0]["timestamp"] if self._messages else None,
                 "end_time": datetime.now().isoformat(),
-                "messages": [
-                    msg for msg in self.conversation_history 
-                    if msg["role"] != "system"  # Exclude system prompt from saved file
-                ]
+                "messages": self._messages
             }
             
-            # Save to file
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(conversation_data, f, indent=2, ensure_ascii=False)
+            # Save to file (orjson writes UTF-8 directly)
+            with open(filename, "wb") as f:
+                f.write(orjson.dumps(conversation_data, option=orjson.OPT_INDENT_2))
             
+            self._saved_count = len(self._messages)
             print(f"Conversation saved to {filename}")
             return filename
         
@@ -182,23 +604,15 @@ class VoiceAssistantBackend:
             print(f"Error saving conversation: {e}")
             return ""
     
-    def process_user_audio(self, audio_data: bytes) -> tuple[str, bytes]:
+    def close(self):
         """
-        Main processing pipeline: STT -> LLM -> TTS
-        Returns: (text_response, audio_response)
+        Close the conversation journal, deleting it if the JSON file is up to date
+        (the journal was created exclusively, so it belongs to this session alone)
         """
-        # Step 1: Transcribe user audio
-        user_text = self.transcribe_audio(audio_data)
-        if not user_text:
-            return "", b""
-        
-        print(f"User said: {user_text}")
-        
-        # Step 2: Get LLM response
-        assistant_text = self.get_llm_response(user_text)
-        print(f"Assistant: {assistant_text}")
-        
-        # Step 3: Convert to speech
-        assistant_audio = self.synthesize_speech(assistant_text)
+        self._journal.close()
         
-        return assistant_text, assistant_audio
\ No newline at end of file
+        if self._saved_count == len(self._messages):
+            try:
+                os.remove(self._journal_path)
+            except FileNotFoundError:
+                pass
@@ -14,10 +14,13 @@ ELEVENLABS_OPTIMIZE_LATENCY = 4  # 0-4, 4 is fastest
 
 # AssemblyAI Configuration
 ASSEMBLYAI_LANGUAGE_CODE = "en"  # English only for faster processing
+REALTIME_END_UTTERANCE_SILENCE_MS = 20000  # Max allowed; utterances end on button release instead
 
 # Performance Settings
 ENABLE_AUDIO_COMPRESSION = True  # Compress audio for faster transfer
 AUDIO_SAMPLE_RATE = 16000  # Lower = faster (16kHz is good for speech)
+MIN_VOICED_BYTES = AUDIO_SAMPLE_RATE // 4 * 2  # Skip STT for clips under 0.25 s of 16-bit audio
+THINKING_FILLER_DELAY = 1.0  # Seconds without a first LLM sentence before a "Let me think" filler plays
 
 # If you want even faster responses, you can:
 # 1. Use "gpt-3.5-turbo" instead of "gpt-4o-mini" (faster but less accurate)
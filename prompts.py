@@ -4,6 +4,12 @@ System prompts and configuration for the voice assistant
 
 WELCOME_MESSAGE = """Hello! I'm your AI voice assistant. I'm here to help you with any questions or conversations you'd like to have. How can I assist you today?"""
 
+FALLBACK_RESPONSE = """I apologize, but I'm having trouble processing that right now. Could you please try again?"""
+
+ACKNOWLEDGEMENT_MESSAGE = """Alright. Let me know if there's anything else I can help with."""
+
+THINKING_MESSAGE = """Let me think..."""
+
 SYSTEM_PROMPT = """You are a helpful, friendly, and conversational AI voice assistant. 
 
 Key guidelines:
@@ -19,4 +25,5 @@ Remember: Your responses will be spoken aloud, so write in a way that sounds nat
 
 # Conversation settings
 MAX_CONVERSATION_HISTORY = 10  # Keep last 10 exchanges
-SILENCE_TIMEOUT = 3  # seconds of silence before considering speech ended
\ No newline at end of file
+SILENCE_TIMEOUT = 3  # seconds of silence before considering speech ended
+BACKCHANNEL_PHRASES = {"hm", "hmm", "mhm", "mm", "uh huh", "uhhuh"}  # Pure fillers answered with ACKNOWLEDGEMENT_MESSAGE, no LLM call